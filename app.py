@@ -1,11 +1,17 @@
 """Advanced PDF to Excel Data Converter - Converts PDF content into structured Excel data."""
 
 import os
+import csv
 import tempfile
 import io
+import multiprocessing
 import re
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
-from typing import List, Dict, Any, Tuple
+from itertools import chain, groupby
+from typing import List, Dict, Any, Tuple, Iterable
 
 from flask import (
     Flask,
@@ -18,17 +24,24 @@ from flask import (
 )
 from werkzeug.utils import secure_filename
 from pdf2image import convert_from_path
-from PIL import Image
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.utils import get_column_letter
 import openpyxl.styles
 import pandas as pd
 
 # Advanced PDF processing libraries
+import pymupdf
 import tabula
 import camelot
 import pytesseract
 
+# Optional: tesserocr keeps an in-process Tesseract engine alive between pages
+try:
+    from tesserocr import PyTessBaseAPI, PSM, OEM
+except ImportError:
+    PyTessBaseAPI = None
+
 # ✅ Set Tesseract path
 pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
 
@@ -42,6 +55,45 @@ OUTPUT_FOLDER = 'output'
 # 🎯 File type restriction
 ALLOWED_EXTENSIONS = {'pdf'}
 
+# ⚙️ OCR settings (Tesseract already runs ~4 threads per page)
+OCR_CONFIG = r'--oem 3 --psm 6'
+OCR_DPI = 150
+OCR_WORKERS = max(1, (os.cpu_count() or 1) // 4)
+
+# 🔤 Word boxes from Tesseract's TSV output; words further apart than
+# COLUMN_GAP_CHARS average character widths start a new table column
+TSV_COLUMNS = [
+    'level', 'page_num', 'block_num', 'par_num', 'line_num', 'word_num',
+    'left', 'top', 'width', 'height', 'conf', 'text',
+]
+TSV_PANDAS_CONFIG = {'dtype': {'text': str}, 'keep_default_na': False}
+COLUMN_GAP_CHARS = 2
+
+# 📄 Pages with at least this much embedded text are treated as born-digital and skip OCR
+NATIVE_TEXT_MIN_CHARS = 1000
+
+# 🔍 Text analysis patterns, compiled once
+_SPLIT_RE = re.compile(r'\s{2,}|\t|\|')
+# Column gap anywhere in a page (whitespace runs must not span lines)
+_COLUMN_GAP_RE = re.compile(r'[^\S\n]{2,}|\t|\|')
+_BULLET_RE = re.compile(r'^[•\-\*\d]+\.?\s')
+# Only ever used as a yes/no search: the shortest prefix that can start an amount
+# ($1,000.00) or a date (01/31/2024) is enough and leaves nothing to backtrack over
+_FIN_RE = re.compile(r'\$[\d,]|\d/\d{1,2}/\d\d')
+
+# 🎨 Shared Summary sheet styles
+TITLE_FONT = openpyxl.styles.Font(bold=True, size=16)
+BOLD_FONT = openpyxl.styles.Font(bold=True)
+
+# 🧵 One tesserocr engine per process, shared by all request threads (the API
+# object is not thread-safe, so pages are recognized under the lock)
+_tess_api = None
+_tess_lock = threading.Lock()
+
+# 🏭 OCR worker processes, started on first use and reused across requests
+_ocr_executor = None
+_ocr_executor_lock = threading.Lock()
+
 # 🚀 Initialize the Flask app
 app = Flask(__name__)
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
@@ -82,16 +134,162 @@ def extract_tables_with_camelot(pdf_path: str) -> List[pd.DataFrame]:
         return []
 
 
-def extract_text_with_ocr(image: Image.Image) -> str:
-    """Extract text from image using OCR."""
+def extract_native_text(pdf_path: str) -> List[str]:
+    """Extract the embedded text layer of every page (empty if the PDF cannot be read)."""
+    try:
+        with pymupdf.open(pdf_path) as doc:
+            return [page.get_text() for page in doc]
+    except Exception as e:
+        print(f"[WARNING] Native text extraction failed: {e}")
+        return []
+
+
+def _get_tess_api() -> "PyTessBaseAPI":
+    """Return this process's tesserocr engine, initializing the language model on first use.
+
+    Callers must hold ``_tess_lock``.
+    """
+    global _tess_api
+    if _tess_api is None:
+        # Same settings as OCR_CONFIG: default engine mode, single uniform block of text
+        _tess_api = PyTessBaseAPI(lang='eng', psm=PSM.SINGLE_BLOCK, oem=OEM.DEFAULT)
+    return _tess_api
+
+
+def _init_ocr_worker() -> None:
+    """Process-pool initializer: load the language model once, when the worker starts."""
+    if PyTessBaseAPI is None:
+        return
+    try:
+        with _tess_lock:
+            _get_tess_api()
+    except Exception as e:
+        # _ocr_batch retries and reports per batch
+        print(f"[WARNING] OCR engine initialization failed: {e}")
+
+
+def _get_ocr_executor() -> ProcessPoolExecutor:
+    """Return the shared OCR process pool, starting it on first use."""
+    global _ocr_executor
+    with _ocr_executor_lock:
+        if _ocr_executor is None:
+            # Spawn rather than fork: the Tabula and Camelot threads (and possibly an
+            # in-process JVM) are running at this point, and a forked child could
+            # inherit one of their locks in a held state
+            _ocr_executor = ProcessPoolExecutor(
+                max_workers=OCR_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_ocr_worker
+            )
+        return _ocr_executor
+
+
+def _layout_from_words(words: pd.DataFrame) -> Tuple[str, List[List[List[str]]]]:
+    """Rebuild a page's text lines and table rows from Tesseract word boxes."""
+    words = words[(words['level'] == 5) & (words['text'].str.strip() != '')]
+    text_lines = []
+    row_cells = []
+    
+    for _, line in words.groupby(['block_num', 'par_num', 'line_num'], sort=False):
+        line = line.sort_values('left')
+        texts = line['text'].str.strip().tolist()
+        lefts = line['left'].to_numpy()
+        rights = lefts + line['width'].to_numpy()
+        
+        # Gaps wider than a few characters separate columns, narrower ones are spaces
+        char_width = line['width'].sum() / max(1, sum(len(text) for text in texts))
+        new_cell = (lefts[1:] - rights[:-1]) > COLUMN_GAP_CHARS * char_width
+        
+        cells = [texts[0]]
+        for text, starts_cell in zip(texts[1:], new_cell):
+            if starts_cell:
+                cells.append(text)
+            else:
+                cells[-1] += ' ' + text
+        
+        text_lines.append(' '.join(texts))
+        row_cells.append(cells)
+    
+    return '\n'.join(text_lines), _collect_table_runs(row_cells)
+
+
+def _ocr_batch(image_paths: List[str]) -> List[Tuple[str, List[List[List[str]]]]]:
+    """Process-pool worker: OCR a batch of page images with a single Tesseract engine."""
+    if PyTessBaseAPI is not None:
+        # The process's persistent engine is reused for every page and reads
+        # the page files itself, so they are never decoded and re-encoded by PIL
+        with _tess_lock:
+            try:
+                api = _get_tess_api()
+            except Exception as e:
+                # e.g. missing tessdata or language pack
+                print(f"[WARNING] OCR extraction failed: {e}")
+                return [("", []) for _ in image_paths]
+            
+            page_layouts = []
+            for path in image_paths:
+                try:
+                    api.SetImageFile(path)
+                    words = pd.read_csv(
+                        io.StringIO(api.GetTSVText(0)),
+                        sep='\t',
+                        names=TSV_COLUMNS,
+                        quoting=csv.QUOTE_NONE,
+                        **TSV_PANDAS_CONFIG
+                    )
+                    page_layouts.append(_layout_from_words(words))
+                except Exception as e:
+                    print(f"[WARNING] OCR extraction failed: {e}")
+                    page_layouts.append(("", []))
+            return page_layouts
+    
+    page_words = {}
     try:
-        # OCR with optimized config
-        config = r'--oem 3 --psm 6'
-        text = pytesseract.image_to_string(image, config=config)
-        return text.strip()
+        # Tesseract treats a text file of image paths as one multi-page input,
+        # so the engine is initialized once per batch instead of once per page
+        manifest_path = os.path.splitext(image_paths[0])[0] + "_batch.txt"
+        with open(manifest_path, 'w', encoding='utf-8') as manifest:
+            manifest.write('\n'.join(image_paths) + '\n')
+        
+        words = pytesseract.image_to_data(
+            manifest_path,
+            config=OCR_CONFIG,
+            output_type=pytesseract.Output.DATAFRAME,
+            pandas_config=TSV_PANDAS_CONFIG
+        )
+        # Word boxes of every input image are numbered by page, starting at 1
+        page_words = dict(list(words.groupby('page_num')))
     except Exception as e:
         print(f"[WARNING] OCR extraction failed: {e}")
-        return ""
+    
+    return [
+        _layout_from_words(page_words[page_num]) if page_num in page_words else ("", [])
+        for page_num in range(1, len(image_paths) + 1)
+    ]
+
+
+def extract_layout_from_pages(image_paths: List[str]) -> List[Tuple[str, List[List[List[str]]]]]:
+    """OCR all page image files into (text, tables) pairs, one batch per worker process."""
+    global _ocr_executor
+    if not image_paths:
+        return []
+    
+    batch_size = -(-len(image_paths) // OCR_WORKERS)
+    batches = [image_paths[i:i + batch_size] for i in range(0, len(image_paths), batch_size)]
+    if len(batches) == 1:
+        return _ocr_batch(batches[0])
+    
+    print(f"[INFO] Running OCR on {len(image_paths)} pages with {len(batches)} workers...")
+    executor = _get_ocr_executor()
+    try:
+        return [page_layout for batch in executor.map(_ocr_batch, batches) for page_layout in batch]
+    except BrokenProcessPool:
+        # A worker died (e.g. out of memory); start a fresh pool for the next request
+        with _ocr_executor_lock:
+            if _ocr_executor is executor:
+                _ocr_executor = None
+        executor.shutdown(wait=False)
+        raise
 
 
 def parse_table_from_text(text: str) -> List[List[str]]:
@@ -103,7 +301,7 @@ def parse_table_from_text(text: str) -> List[List[str]]:
         for line in lines:
             if line.strip():
                 # Split by common table separators
-                cells = re.split(r'\s{2,}|\t|\|', line.strip())
+                cells = _SPLIT_RE.split(line.strip())
                 cells = [cell.strip() for cell in cells if cell.strip()]
                 if cells:
                     table_data.append(cells)
@@ -114,43 +312,37 @@ def parse_table_from_text(text: str) -> List[List[str]]:
         return []
 
 
+def _collect_table_runs(row_cells: Iterable[List[str]]) -> List[List[List[str]]]:
+    """Group consecutive multi-column rows into tables."""
+    potential_tables = []
+    current_table = []
+    
+    for cells in row_cells:
+        if len(cells) >= 2:  # At least 2 columns
+            current_table.append(cells)
+        else:
+            # End of current table
+            if len(current_table) >= 2:  # At least 2 rows
+                potential_tables.append(current_table)
+            current_table = []
+    
+    # Add the last table if it exists
+    if len(current_table) >= 2:
+        potential_tables.append(current_table)
+    
+    return potential_tables
+
+
 def detect_table_patterns_in_text(text: str) -> List[List[str]]:
     """Detect table patterns in text using regex and spacing analysis."""
     try:
-        lines = text.strip().split('\n')
-        potential_tables = []
-        current_table = []
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            
-            # Check if line has table-like characteristics
-            # Multiple columns separated by spaces/tabs
-            if re.search(r'\s{2,}', line) or '\t' in line:
-                # Split by multiple spaces or tabs
-                cells = re.split(r'\s{2,}|\t', line)
-                cells = [cell.strip() for cell in cells if cell.strip()]
-                
-                if len(cells) >= 2:  # At least 2 columns
-                    current_table.append(cells)
-                else:
-                    # End of current table
-                    if len(current_table) >= 2:  # At least 2 rows
-                        potential_tables.append(current_table)
-                    current_table = []
-            else:
-                # End of current table
-                if len(current_table) >= 2:
-                    potential_tables.append(current_table)
-                current_table = []
-        
-        # Add the last table if it exists
-        if len(current_table) >= 2:
-            potential_tables.append(current_table)
-        
-        return potential_tables
+        # A line is table-like when it splits into multiple columns on
+        # runs of spaces, tabs or pipes (one regex pass per line)
+        return _collect_table_runs(
+            [cell for cell in map(str.strip, _SPLIT_RE.split(line)) if cell]
+            for line in map(str.strip, text.split('\n'))
+            if line
+        )
     except Exception as e:
         print(f"[WARNING] Table pattern detection failed: {e}")
         return []
@@ -165,135 +357,165 @@ def extract_structured_data_from_text(text: str) -> Dict[str, Any]:
         'financial_data': []
     }
     
-    lines = text.strip().split('\n')
-    
-    for line in lines:
+    # Only '\n' separates lines (str.splitlines would also split on form feeds etc.)
+    for line in text.split('\n'):
         line = line.strip()
         if not line:
             continue
-            
+        
+        # Cheap character checks decide first; the regexes only confirm candidates
+        first_char = line[0]
+        
         # Detect headers (short lines, often in caps)
         if len(line) < 100 and (line.isupper() or line.startswith(('Chapter', 'Section', 'Part'))):
-            structured_data['headers'].append(line)
+            category = 'headers'
         
         # Detect lists (bullet points, numbers)
-        elif re.match(r'^[\•\-\*\d]+\.?\s', line):
-            structured_data['lists'].append(line)
+        elif (first_char in '•-*' or first_char.isdigit()) and _BULLET_RE.match(line):
+            category = 'lists'
         
         # Detect financial data (amounts, dates, etc.)
-        elif re.search(r'\$[\d,]+\.?\d*|\d{1,2}/\d{1,2}/\d{2,4}', line):
-            structured_data['financial_data'].append(line)
+        elif ('$' in line or '/' in line) and _FIN_RE.search(line):
+            category = 'financial_data'
         
         # Long lines are paragraphs
         elif len(line) > 50:
-            structured_data['paragraphs'].append(line)
+            category = 'paragraphs'
+        
+        else:
+            continue
+        
+        structured_data[category].append(line)
     
     return structured_data
 
 
+def _styled_cell(ws, value: Any, font: openpyxl.styles.Font = BOLD_FONT) -> WriteOnlyCell:
+    """Create a write-only cell carrying one of the shared fonts."""
+    cell = WriteOnlyCell(ws, value=value)
+    cell.font = font
+    return cell
+
+
 def create_consolidated_excel(pdf_path: str, all_data: Dict[str, Any]) -> Workbook:
     """Create a consolidated Excel workbook with better organization."""
-    wb = Workbook()
-    wb.remove(wb.active)  # Remove default sheet
+    # Write-only workbooks stream appended rows instead of keeping a Cell object per value
+    wb = Workbook(write_only=True)
+    
+    # Non-empty text items, shared by the data sheet and the summary counts
+    headers = [h for h in all_data.get('headers', []) if h.strip()]
+    lists = [l for l in all_data.get('lists', []) if l.strip()]
+    financial_data = [f for f in all_data.get('financial_data', []) if f.strip()]
+    paragraphs = [p for p in all_data.get('paragraphs', []) if p.strip()]
     
     # Create main data sheet
     ws_main = wb.create_sheet("Data")
     
-    current_row = 1
-    
-    # Process all tables and consolidate them
-    all_tables = []
-    
-    # Add Tabula tables
-    for i, table in enumerate(all_data.get('tabula_tables', [])):
-        if not table.empty:
-            all_tables.append(("Tabula Table", table))
-    
-    # Add Camelot tables
-    for i, table in enumerate(all_data.get('camelot_tables', [])):
-        if not table.empty:
-            all_tables.append(("Camelot Table", table))
-    
-    # Add OCR tables
-    for i, table in enumerate(all_data.get('ocr_tables', [])):
-        if table:
-            all_tables.append(("OCR Table", pd.DataFrame(table)))
-    
-    # If we have tables, add them to the main sheet
-    if all_tables:
-        for table_name, table in all_tables:
-            # Add table data directly without header
-            for row_idx, row_data in enumerate(table.values, 1):
-                # Skip completely empty rows
-                if not all(pd.isna(cell) for cell in row_data):
-                    for col_idx, cell_value in enumerate(row_data, 1):
-                        ws_main.cell(row=current_row, column=col_idx, value=cell_value)
-                    current_row += 1
-    
-    # Add headers if any (as a simple list)
-    if all_data.get('headers'):
-        for header in all_data['headers']:
-            if header.strip():  # Only add non-empty headers
-                ws_main.cell(row=current_row, column=1, value=header)
-                current_row += 1
-    
-    # Add financial data if any (as a simple list)
-    if all_data.get('financial_data'):
-        for item in all_data['financial_data']:
-            if item.strip():  # Only add non-empty items
-                ws_main.cell(row=current_row, column=1, value=item)
-                current_row += 1
+    # Add Tabula and Camelot tables directly without header, skipping completely empty rows
+    total_tables = 0
+    for table in chain(all_data.get('tabula_tables', []), all_data.get('camelot_tables', [])):
+        if table.empty:
+            continue
+        total_tables += 1
+        keep = table.notna().any(axis=1).to_numpy()
+        for row in table.to_numpy()[keep].tolist():
+            ws_main.append(row)
     
-    # Add lists if any (as a simple list)
-    if all_data.get('lists'):
-        for item in all_data['lists']:
-            if item.strip():  # Only add non-empty items
-                ws_main.cell(row=current_row, column=1, value=item)
-                current_row += 1
+    # Add OCR tables (already lists of non-empty cell rows, so no DataFrame is needed)
+    for table in all_data.get('ocr_tables', []):
+        if not table:
+            continue
+        total_tables += 1
+        for row in table:
+            ws_main.append(row)
     
-    # Add paragraphs if any (as a simple list)
-    if all_data.get('paragraphs'):
-        for paragraph in all_data['paragraphs']:
-            if paragraph.strip():  # Only add non-empty paragraphs
-                ws_main.cell(row=current_row, column=1, value=paragraph)
-                current_row += 1
+    # Add headers, financial data, lists and paragraphs (as simple lists)
+    for item in chain(headers, financial_data, lists, paragraphs):
+        ws_main.append([item])
     
     # Create summary sheet
     ws_summary = wb.create_sheet("Summary")
-    ws_summary.cell(row=1, column=1, value="PDF to Excel Data Conversion Summary")
-    ws_summary.cell(row=1, column=1).font = openpyxl.styles.Font(bold=True, size=16)
+    ws_summary.append([_styled_cell(ws_summary, "PDF to Excel Data Conversion Summary", TITLE_FONT)])
+    ws_summary.append([])
     
     # Add summary statistics
-    row = 3
-    ws_summary.cell(row=row, column=1, value="Content Type")
-    ws_summary.cell(row=row, column=2, value="Count")
-    ws_summary.cell(row=row, column=1).font = openpyxl.styles.Font(bold=True)
-    ws_summary.cell(row=row, column=2).font = openpyxl.styles.Font(bold=True)
-    
-    row += 1
-    ws_summary.cell(row=row, column=1, value="Total Tables")
-    ws_summary.cell(row=row, column=2, value=len(all_tables))
+    ws_summary.append([_styled_cell(ws_summary, "Content Type"), _styled_cell(ws_summary, "Count")])
     
-    row += 1
-    ws_summary.cell(row=row, column=1, value="Headers")
-    ws_summary.cell(row=row, column=2, value=len([h for h in all_data.get('headers', []) if h.strip()]))
-    
-    row += 1
-    ws_summary.cell(row=row, column=1, value="Lists")
-    ws_summary.cell(row=row, column=2, value=len([l for l in all_data.get('lists', []) if l.strip()]))
-    
-    row += 1
-    ws_summary.cell(row=row, column=1, value="Financial Data")
-    ws_summary.cell(row=row, column=2, value=len([f for f in all_data.get('financial_data', []) if f.strip()]))
+    ws_summary.append(["Total Tables", total_tables])
+    ws_summary.append(["Headers", len(headers)])
+    ws_summary.append(["Lists", len(lists)])
+    ws_summary.append(["Financial Data", len(financial_data)])
     
     # Add conversion timestamp
-    row += 2
-    ws_summary.cell(row=row, column=1, value="Conversion Date")
-    ws_summary.cell(row=row, column=2, value=datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+    ws_summary.append([])
+    ws_summary.append(["Conversion Date", datetime.now().strftime("%Y-%m-%d %H:%M:%S")])
     
     return wb
 
 
+def _render_pages(pdf_path: str, output_folder: str, **page_range) -> List[str]:
+    """Rasterize PDF pages (optionally first_page..last_page, 1-based) to TIFF files for OCR."""
+    return convert_from_path(
+        pdf_path,
+        fmt="tiff",
+        dpi=OCR_DPI,
+        grayscale=True,
+        thread_count=os.cpu_count() or 1,
+        output_folder=output_folder,
+        paths_only=True,
+        poppler_path=POPPLER_PATH,
+        **page_range
+    )
+
+
+def extract_page_texts(pdf_path: str) -> Tuple[Dict[int, str], Dict[int, List[List[List[str]]]]]:
+    """Get the text of every page, from the embedded text layer or via OCR, and the OCR'd tables."""
+    # Method 3: Embedded text layer for born-digital pages
+    native_texts = extract_native_text(pdf_path)
+    page_texts = {
+        page_num: text
+        for page_num, text in enumerate(native_texts)
+        if len(text.strip()) >= NATIVE_TEXT_MIN_CHARS
+    }
+    page_tables = {}
+    ocr_page_nums = [page_num for page_num in range(len(native_texts)) if page_num not in page_texts]
+    if page_texts:
+        print(f"[INFO] Using embedded text for {len(page_texts)} born-digital pages")
+    
+    # Method 4: OCR for image-based pages
+    # (every page is rendered if the page structure could not be read)
+    if ocr_page_nums or not native_texts:
+        print("[INFO] Converting PDF to images for OCR analysis...")
+        with tempfile.TemporaryDirectory() as temp_dir:
+            if ocr_page_nums:
+                # Render each run of consecutive OCR pages on its own, so born-digital
+                # pages between them are never rasterized
+                image_paths = []
+                rendered_page_nums = []
+                for _, run in groupby(enumerate(ocr_page_nums), key=lambda item: item[1] - item[0]):
+                    run = [page_num for _, page_num in run]
+                    run_paths = _render_pages(pdf_path, temp_dir, first_page=run[0] + 1, last_page=run[-1] + 1)
+                    # PyMuPDF can repair damaged PDFs into pages poppler does not render;
+                    # OCR whatever was rendered and skip the rest
+                    image_paths.extend(run_paths[:len(run)])
+                    rendered_page_nums.extend(run[:len(run_paths)])
+                if len(rendered_page_nums) < len(ocr_page_nums):
+                    print(f"[WARNING] Only {len(rendered_page_nums)} of {len(ocr_page_nums)} requested pages "
+                          f"were rendered, skipping {len(ocr_page_nums) - len(rendered_page_nums)} pages")
+                ocr_page_nums = rendered_page_nums
+            else:
+                image_paths = _render_pages(pdf_path, temp_dir)
+                ocr_page_nums = list(range(len(image_paths)))
+            
+            # Extract text and word-position tables from the rendered page images
+            page_layouts = extract_layout_from_pages(image_paths)
+            for page_num, (text, tables) in zip(ocr_page_nums, page_layouts):
+                page_texts[page_num] = text
+                page_tables[page_num] = tables
+    
+    return page_texts, page_tables
+
+
 def process_pdf_to_structured_data(pdf_path: str) -> Dict[str, Any]:
     """Process PDF and extract structured data using multiple methods."""
     all_data = {
@@ -309,22 +531,22 @@ def process_pdf_to_structured_data(pdf_path: str) -> Dict[str, Any]:
     try:
         print("[INFO] Starting comprehensive PDF data extraction...")
         
-        # Method 1: Tabula-py for native PDF tables
-        tabula_tables = extract_tables_with_tabula(pdf_path)
-        all_data['tabula_tables'] = tabula_tables
-        
-        # Method 2: Camelot-py for bordered tables
-        camelot_tables = extract_tables_with_camelot(pdf_path)
-        all_data['camelot_tables'] = camelot_tables
-        
-        # Method 3: OCR + Pattern Detection for image-based tables
-        print("[INFO] Converting PDF to images for OCR analysis...")
-        images = convert_from_path(
-            pdf_path, 
-            fmt="PNG",
-            dpi=200,
-            poppler_path=POPPLER_PATH
-        )
+        # Methods 1 & 2 run in background threads while the page text is extracted:
+        # Tabula (JVM subprocess) and Camelot work independently of the OCR subprocesses
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            # Method 1: Tabula-py for native PDF tables
+            tabula_future = executor.submit(extract_tables_with_tabula, pdf_path)
+            
+            # Method 2: Camelot-py for bordered tables
+            camelot_future = executor.submit(extract_tables_with_camelot, pdf_path)
+            
+            # Methods 3 & 4: Embedded text layer or OCR for every page
+            page_texts, page_tables = extract_page_texts(pdf_path)
+            
+            tabula_tables = tabula_future.result()
+            all_data['tabula_tables'] = tabula_tables
+            camelot_tables = camelot_future.result()
+            all_data['camelot_tables'] = camelot_tables
         
         ocr_tables = []
         structured_text_data = {
@@ -334,15 +556,20 @@ def process_pdf_to_structured_data(pdf_path: str) -> Dict[str, Any]:
             'financial_data': []
         }
         
-        for page_num, img in enumerate(images):
-            print(f"[INFO] Processing page {page_num + 1} with OCR...")
+        for page_num in sorted(page_texts):
+            print(f"[INFO] Analyzing text of page {page_num + 1}...")
+            full_text = page_texts[page_num]
             
-            # Extract text from image
-            full_text = extract_text_with_ocr(img)
+            # Blank pages and OCR noise from images have nothing to analyze
+            if not any(char.isalnum() for char in full_text):
+                continue
             
-            # Detect table patterns in the text
-            page_tables = detect_table_patterns_in_text(full_text)
-            ocr_tables.extend(page_tables)
+            # OCR'd pages come with tables rebuilt from word positions; embedded text is
+            # scanned for table patterns (only possible where columns are separated)
+            if page_num in page_tables:
+                ocr_tables.extend(page_tables[page_num])
+            elif _COLUMN_GAP_RE.search(full_text):
+                ocr_tables.extend(detect_table_patterns_in_text(full_text))
             
             # Extract structured data from text
             page_structured_data = extract_structured_data_from_text(full_text)
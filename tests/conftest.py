@@ -0,0 +1,12 @@
+import os
+
+import pytest
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    # Keep pytest's numbered, per-run temp dirs but root them in RAM when the
+    # platform has /dev/shm. Must run before the tmp_path plugin reads it; an
+    # explicit PYTEST_DEBUG_TEMPROOT or --basetemp still wins.
+    if os.path.isdir("/dev/shm"):
+        os.environ.setdefault("PYTEST_DEBUG_TEMPROOT", "/dev/shm")
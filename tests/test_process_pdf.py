@@ -1,13 +1,21 @@
 import base64
 import os
+import shutil
 import sys
+from types import SimpleNamespace
+from concurrent.futures import ThreadPoolExecutor
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from pathlib import Path
+import pandas as pd
+import pymupdf
+import pytest
+from openpyxl import load_workbook
 from PIL import Image
+import app
 from app import process_pdf, app as flask_app
 
-# Base64-encoded minimal PDF used for tests.
-# To regenerate PDF_BASE64, run:
+# Base64-encoded minimal PDF used for tests, decoded once at import.
+# To regenerate the encoded string, run:
 #   python - <<'END'
 #   import base64, pathlib
 #   pdf_bytes = b"%PDF-1.1\n%\xe2\xe3\xcf\xd3\n1 0 obj<</Type/Catalog/Pages 2 0 R>>endobj\n2 0 obj<</Type/Pages/Count 0/Kids[]>>endobj\ntrailer<</Root 1 0 R>>\n%%EOF"
@@ -15,30 +23,260 @@ from app import process_pdf, app as flask_app
 #   print(base64.b64encode(pdf_bytes).decode())
 #   END
 
-PDF_BASE64 = (
+_PDF_BYTES = base64.b64decode(
     "JVBERi0xLjEKJeLjz9MKMSAwIG9iajw8L1R5cGUvQ2F0YWxvZy9QYWdlcyAyIDAgUj4+ZW5kb2JqCjIgMCBvYmo8PC9UeXBlL1BhZ2VzL0NvdW50IDAvS2lkc1tdPj5lbmRvYmoKdHJhaWxlcjw8L1Jvb3QgMSAwIFI+PgolJUVPRg=="
 )
 
+# Blank page image returned by the fake convert_from_path.
+_FAKE_IMG = Image.new("RGB", (10, 10), color="white")
 
-def _write_sample_pdf(tmp_path: Path) -> Path:
-    pdf_path = tmp_path / "sample.pdf"
-    pdf_path.write_bytes(base64.b64decode(PDF_BASE64))
+
+# Two statement lines: wide gaps between columns, a normal space inside "Coffee shop".
+STATEMENT_WORDS = [
+    (1, 1, 0, "01/01/2020"), (1, 1, 120, "Coffee"), (1, 1, 176, "shop"), (1, 1, 300, "4.50"),
+    (1, 2, 0, "01/02/2020"), (1, 2, 120, "Rent"), (1, 2, 300, "1,200.00"),
+]
+STATEMENT_TABLE = [["01/01/2020", "Coffee shop", "4.50"], ["01/02/2020", "Rent", "1,200.00"]]
+
+
+def _word_boxes(words, pages=None):
+    """Build Tesseract TSV rows from (page_num, line_num, left, text), 8px per character."""
+    pages = pages or sorted({page_num for page_num, _, _, _ in words})
+    rows = [
+        # Page-level rows carry no text and must be ignored
+        {"level": 1, "page_num": page_num, "block_num": 0, "par_num": 0, "line_num": 0,
+         "word_num": 0, "left": 0, "top": 0, "width": 600, "height": 800, "conf": -1.0, "text": ""}
+        for page_num in pages
+    ]
+    for word_num, (page_num, line_num, left, text) in enumerate(words, 1):
+        rows.append({
+            "level": 5, "page_num": page_num, "block_num": 1, "par_num": 1, "line_num": line_num,
+            "word_num": word_num, "left": left, "top": line_num * 20,
+            "width": len(text) * 8, "height": 12, "conf": 95.0, "text": text,
+        })
+    return pd.DataFrame(rows, columns=app.TSV_COLUMNS)
+
+
+NATIVE_LINE = "Statement of account, all figures in dollars. "
+NATIVE_PAGE_NUMS = (0, 2)
+
+
+@pytest.fixture
+def mixed_pdf(tmp_path) -> Path:
+    """Five pages: 0 and 2 born-digital, the rest blank or nearly (scanned)."""
+    path = tmp_path / "mixed.pdf"
+    with pymupdf.open() as doc:
+        for page_num in range(5):
+            page = doc.new_page()
+            if page_num in NATIVE_PAGE_NUMS:
+                for line_num in range(30):
+                    page.insert_text((36, 36 + 12 * line_num), NATIVE_LINE, fontsize=8)
+            elif page_num == 4:
+                page.insert_text((36, 36), "Page 5", fontsize=8)
+        doc.save(path)
+    return path
+
+
+def _fake_rendering(monkeypatch, pages_rendered=None):
+    """Fake poppler (optionally rendering only the first pages_rendered pages of each
+    range) and OCR (page text is the image file name); returns the requested ranges."""
+    page_ranges = []
+
+    def fake_convert_from_path(pdf_path, output_folder, first_page, last_page, **kwargs):
+        page_ranges.append((first_page, last_page))
+        page_nums = range(first_page, last_page + 1)[:pages_rendered]
+        return [os.path.join(output_folder, f"page-{page_num}.tif") for page_num in page_nums]
+
+    def fake_extract_layout_from_pages(image_paths):
+        return [(os.path.basename(path), [[["cell", str(i)]]]) for i, path in enumerate(image_paths)]
+
+    monkeypatch.setattr(app, "convert_from_path", fake_convert_from_path, raising=True)
+    monkeypatch.setattr(app, "extract_layout_from_pages", fake_extract_layout_from_pages, raising=True)
+    return page_ranges
+
+
+def test_extract_page_texts_renders_each_run_of_ocr_pages(monkeypatch, mixed_pdf):
+    page_ranges = _fake_rendering(monkeypatch)
+
+    page_texts, page_tables = app.extract_page_texts(str(mixed_pdf))
+
+    # Born-digital page 3 (index 2) between the OCR runs is never rendered
+    assert page_ranges == [(2, 2), (4, 5)]
+    assert all(page_texts[page_num].startswith(NATIVE_LINE) for page_num in NATIVE_PAGE_NUMS)
+    assert {page_num: page_texts[page_num] for page_num in page_tables} == {
+        1: "page-2.tif", 3: "page-4.tif", 4: "page-5.tif"
+    }
+
+
+def test_extract_page_texts_skips_pages_poppler_did_not_render(monkeypatch, mixed_pdf):
+    page_ranges = _fake_rendering(monkeypatch, pages_rendered=1)
+
+    page_texts, page_tables = app.extract_page_texts(str(mixed_pdf))
+
+    assert page_ranges == [(2, 2), (4, 5)]
+    assert sorted(page_texts) == [0, 1, 2, 3]
+    assert {page_num: page_texts[page_num] for page_num in page_tables} == {1: "page-2.tif", 3: "page-4.tif"}
+
+
+@pytest.fixture(scope="session")
+def session_sample_pdf(tmp_path_factory) -> Path:
+    pdf_path = tmp_path_factory.mktemp("pdf_template") / "sample.pdf"
+    pdf_path.write_bytes(_PDF_BYTES)
     return pdf_path
 
 
-def test_process_pdf(monkeypatch, tmp_path):
-    pdf_file = _write_sample_pdf(tmp_path)
+@pytest.fixture
+def sample_pdf(session_sample_pdf, tmp_path) -> Path:
+    pdf_path = tmp_path / "sample.pdf"
+    shutil.copyfile(session_sample_pdf, pdf_path)
+    return pdf_path
+
 
-    def fake_convert_from_path(path, fmt="jpeg", output_folder=None):
-        img = Image.new("RGB", (10, 10), color="white")
-        return [img]
+def test_process_pdf(monkeypatch, tmp_path, sample_pdf):
+    def fake_convert_from_path(path, fmt="jpeg", output_folder=None, **kwargs):
+        image_path = os.path.join(output_folder, "page-1.tif")
+        _FAKE_IMG.save(image_path)
+        return [image_path]
 
-    def fake_image_to_string(img):
-        return "01/01/2020 Test 1.00 2.00 3.00"
+    def fake_image_to_data(img, **kwargs):
+        return _word_boxes(STATEMENT_WORDS)
 
-    monkeypatch.setattr("app.convert_from_path", fake_convert_from_path)
-    monkeypatch.setattr("app.pytesseract.image_to_string", fake_image_to_string)
+    monkeypatch.setattr(app, "PyTessBaseAPI", None, raising=True)
+    monkeypatch.setattr(app, "convert_from_path", fake_convert_from_path, raising=True)
+    monkeypatch.setattr(app.pytesseract, "image_to_data", fake_image_to_data, raising=True)
 
     flask_app.config["OUTPUT_FOLDER"] = str(tmp_path)
-    excel_name = process_pdf(str(pdf_file))
-    assert (tmp_path / excel_name).exists()
+    excel_name = process_pdf(str(sample_pdf))
+    excel_path = Path(flask_app.config["OUTPUT_FOLDER"]) / excel_name
+    assert excel_path.is_file()
+
+    data_rows = [
+        [value for value in row if value is not None]
+        for row in load_workbook(excel_path)["Data"].iter_rows(values_only=True)
+    ]
+    assert STATEMENT_TABLE[0] in data_rows
+    assert STATEMENT_TABLE[1] in data_rows
+
+
+def test_layout_from_words_splits_columns_on_wide_gaps():
+    text, tables = app._layout_from_words(_word_boxes(STATEMENT_WORDS))
+
+    assert text == "01/01/2020 Coffee shop 4.50\n01/02/2020 Rent 1,200.00"
+    assert tables == [STATEMENT_TABLE]
+
+
+def test_layout_from_words_needs_two_multi_column_lines_for_a_table():
+    words = [
+        (1, 1, 0, "Coffee"), (1, 1, 56, "shop"),
+        (1, 2, 0, "Total"), (1, 2, 300, "4.50"),
+        (1, 3, 0, "Thank"), (1, 3, 48, "you"),
+    ]
+    text, tables = app._layout_from_words(_word_boxes(words))
+
+    assert text == "Coffee shop\nTotal 4.50\nThank you"
+    assert tables == []
+
+
+def test_ocr_batch_keeps_pages_aligned(monkeypatch, tmp_path):
+    # Page 2 has no words at all; page 3 must not shift into its place
+    words = STATEMENT_WORDS + [(3, 1, 0, "Closing"), (3, 1, 64, "balance")]
+
+    def fake_image_to_data(manifest_path, **kwargs):
+        return _word_boxes(words)
+
+    monkeypatch.setattr(app, "PyTessBaseAPI", None, raising=True)
+    monkeypatch.setattr(app.pytesseract, "image_to_data", fake_image_to_data, raising=True)
+
+    image_paths = [str(tmp_path / f"page-{page_num}.tif") for page_num in (1, 2, 3)]
+    layouts = app._ocr_batch(image_paths)
+
+    assert layouts[0] == ("01/01/2020 Coffee shop 4.50\n01/02/2020 Rent 1,200.00", [STATEMENT_TABLE])
+    assert layouts[1] == ("", [])
+    assert layouts[2] == ("Closing balance", [])
+
+
+@pytest.mark.parametrize("workers, page_count, batch_sizes", [(3, 7, [3, 3, 1]), (4, 10, [3, 3, 3, 1])])
+def test_extract_layout_from_pages_reassembles_batches_in_order(monkeypatch, workers, page_count, batch_sizes):
+    batches = []
+
+    def fake_ocr_batch(image_paths):
+        batches.append(image_paths)
+        return [(f"text of {path}", []) for path in image_paths]
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    monkeypatch.setattr(app, "OCR_WORKERS", workers, raising=True)
+    monkeypatch.setattr(app, "_ocr_batch", fake_ocr_batch, raising=True)
+    monkeypatch.setattr(app, "_get_ocr_executor", lambda: executor, raising=True)
+
+    image_paths = [f"page-{page_num}.tif" for page_num in range(1, page_count + 1)]
+    with executor:
+        layouts = app.extract_layout_from_pages(image_paths)
+
+    assert layouts == [(f"text of {path}", []) for path in image_paths]
+    assert sorted(len(batch) for batch in batches) == sorted(batch_sizes)
+
+
+def test_extract_structured_data_from_text_keeps_every_category():
+    assert app.extract_structured_data_from_text("") == {
+        "headers": [], "lists": [], "paragraphs": [], "financial_data": []
+    }
+    # A form feed inside a line does not split it
+    assert app.extract_structured_data_from_text("TOTAL\x0cDUE $4.50")["headers"] == ["TOTAL\x0cDUE $4.50"]
+
+
+class FakeTessAPI:
+    """Stands in for tesserocr.PyTessBaseAPI, answering with header-less TSV per image file."""
+
+    def __init__(self, page_words, **kwargs):
+        self.page_words = page_words
+        self.image_path = None
+
+    def SetImageFile(self, path):
+        self.image_path = path
+
+    def GetTSVText(self, page_number):
+        words = self.page_words[os.path.basename(self.image_path)]
+        # Tesseract numbers the page page_number + 1; a page without words keeps its page row
+        return _word_boxes(words, pages=[page_number + 1]).to_csv(sep="\t", header=False, index=False)
+
+
+def _use_tesserocr(monkeypatch, api_factory):
+    monkeypatch.setattr(app, "PyTessBaseAPI", api_factory, raising=True)
+    monkeypatch.setattr(app, "PSM", SimpleNamespace(SINGLE_BLOCK=6), raising=False)
+    monkeypatch.setattr(app, "OEM", SimpleNamespace(DEFAULT=3), raising=False)
+    monkeypatch.setattr(app, "_tess_api", None, raising=True)
+
+
+def test_ocr_batch_reads_tesserocr_tsv(monkeypatch):
+    page_words = {
+        "page-1.tif": STATEMENT_WORDS,
+        "page-2.tif": [],
+        "page-3.tif": [(1, 1, 0, "Closing"), (1, 1, 64, "balance")],
+    }
+    created = []
+
+    def fake_api(**kwargs):
+        created.append(kwargs)
+        return FakeTessAPI(page_words, **kwargs)
+
+    _use_tesserocr(monkeypatch, fake_api)
+
+    layouts = app._ocr_batch(["page-1.tif", "page-2.tif", "page-3.tif"])
+    # The second batch reuses the engine instead of loading the model again
+    assert app._ocr_batch(["page-3.tif"]) == [("Closing balance", [])]
+
+    assert layouts == [
+        ("01/01/2020 Coffee shop 4.50\n01/02/2020 Rent 1,200.00", [STATEMENT_TABLE]),
+        ("", []),
+        ("Closing balance", []),
+    ]
+    assert len(created) == 1
+
+
+def test_ocr_batch_survives_tesserocr_init_failure(monkeypatch):
+    def failing_api(**kwargs):
+        raise RuntimeError("Failed to init API, possibly an invalid tessdata path")
+
+    _use_tesserocr(monkeypatch, failing_api)
+
+    assert app._ocr_batch(["page-1.tif", "page-2.tif"]) == [("", []), ("", [])]